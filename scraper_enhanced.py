@@ -38,20 +38,36 @@ Usage:
 """
 
 import argparse
+import functools
+import hashlib
+import heapq
+import inspect
 import json
 import os
 import re
 import sys
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.workbook.defined_name import DefinedName
 from openpyxl.worksheet.datavalidation import DataValidation
 
+try:
+    import orjson  # Optional: faster decoding of the large plan payloads
+except ImportError:
+    orjson = None
+
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -73,6 +89,38 @@ HEADERS = {
     "Referer": "https://www.energymadeeasy.gov.au/",
 }
 
+MAX_CONCURRENT_REQUESTS = 10  # Upper bound on parallel API calls
+
+# Shared session so every API call reuses pooled keep-alive connections
+# instead of paying a fresh TCP + TLS handshake each time.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    # read=0: a stalled response fails after one timeout instead of four
+    max_retries=Retry(total=3, read=0, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# On-disk cache for slow-changing lookups (postcode locations, distributors)
+CACHE_DIR = Path.home() / ".cache" / "energy_made_easy"
+CACHE_TTL = 24 * 60 * 60  # seconds
+LOOKUP_CACHE_TTL = 7 * 24 * 60 * 60  # postcode/distributor mappings rarely change
+
+# Postcode blocks for the states Energy Made Easy covers (NSW, QLD, SA, TAS,
+# ACT), used to reject out-of-coverage input before any request is made
+COVERED_POSTCODE_RANGES = [
+    (200, 299),    # ACT (PO boxes)
+    (1000, 2999),  # NSW and ACT
+    (4000, 5999),  # QLD and SA
+    (7000, 7999),  # TAS
+    (9000, 9999),  # QLD (PO boxes)
+]
+# Postcodes outside those blocks that still include covered localities
+# (NSW towns on Victorian border postcodes, remote SA on an NT postcode)
+COVERED_BORDER_POSTCODES = {"0872", "3585", "3586", "3644", "3691", "3707"}
+
 PAYMENT_OPTIONS = {
     "P": "Post/Mail",
     "DD": "Direct Debit",
@@ -99,31 +147,112 @@ FEE_TYPES = {
     "OF": "Other Fee",
 }
 
+METER_TYPES = {
+    "Type 6": "Basic Meter",
+    "Type 4": "Smart Meter",
+    "Type 4a": "Smart Meter (4a)",
+    "Type 1": "Interval Meter",
+}
+
+CONTRACT_TERMS = {
+    "E": "No lock-in",
+    "1": "1 year",
+    "2": "2 years",
+    "3": "3 years",
+}
+
+
+# ---------------------------------------------------------------------------
+# Response Cache
+# ---------------------------------------------------------------------------
+
+
+def disk_cache(ttl: int = CACHE_TTL):
+    """Cache a function's JSON-serialisable return value on disk for ``ttl`` seconds.
+
+    Entries are keyed by a hash of the function name and its bound arguments
+    (defaults included) and stored under ``CACHE_DIR`` as
+    ``{"t": timestamp, "v": value}``. Exceptions and empty results (``[]``,
+    ``0``) are never cached, so a transient empty answer is retried on the
+    next run; a missing, corrupt or unwritable cache falls through to the call.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps([func.__name__, list(bound.arguments.values())])
+            path = CACHE_DIR / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                if time.time() - entry["t"] < ttl:
+                    return entry["v"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+            value = func(*args, **kwargs)
+            if not value:
+                return value
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps({"t": time.time(), "v": value}), encoding="utf-8")
+            except OSError:
+                pass
+            return value
+
+        return wrapper
+
+    return decorator
+
 
 # ---------------------------------------------------------------------------
 # API Functions
 # ---------------------------------------------------------------------------
 
 
+def _parse_json(resp: requests.Response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is None:
+        return resp.json()
+    try:
+        return orjson.loads(resp.content)
+    except orjson.JSONDecodeError as e:
+        # Match resp.json(), whose decode errors are RequestExceptions
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos, response=resp) from e
+
+
+def is_covered_postcode(postcode: str) -> bool:
+    """Return whether a 4-digit postcode can fall in a covered state (no network call)."""
+    if postcode in COVERED_BORDER_POSTCODES:
+        return True
+    code = int(postcode)
+    return any(low <= code <= high for low, high in COVERED_POSTCODE_RANGES)
+
+
+@disk_cache(ttl=LOOKUP_CACHE_TTL)
 def validate_postcode(postcode: str) -> list[dict]:
     """Validate a postcode and return matching locations."""
     url = f"{POSTCODE_API}/{postcode}"
-    resp = requests.get(url, headers=HEADERS, timeout=30)
+    resp = SESSION.get(url, timeout=30)
     resp.raise_for_status()
-    data = resp.json()
+    data = _parse_json(resp)
     locations = data.get("data", [])
     return locations
 
 
+@disk_cache(ttl=LOOKUP_CACHE_TTL)
 def fetch_distributors(postcode: str, fuel_type: str = "E") -> list[dict]:
     """Fetch available electricity distributors for a postcode from the meta API.
 
     Returns a list of dicts with 'id' and 'name' keys, deduplicated.
     """
     url = f"{META_API}/{postcode}/meta?fuelType={fuel_type}"
-    resp = requests.get(url, headers=HEADERS, timeout=30)
+    resp = SESSION.get(url, timeout=30)
     resp.raise_for_status()
-    data = resp.json()
+    data = _parse_json(resp)
 
     seen = set()
     distributors = []
@@ -140,6 +269,16 @@ def fetch_distributors(postcode: str, fuel_type: str = "E") -> list[dict]:
 def probe_distributor_plans(postcode: str, dist_id: str, fuel_type: str = "E",
                             customer_type: str = "R") -> int:
     """Quick probe to check how many plans a distributor has. Returns count or -1 on error."""
+    try:
+        return _count_distributor_plans(postcode, dist_id, fuel_type, customer_type)
+    except Exception:
+        return -1
+
+
+@disk_cache()
+def _count_distributor_plans(postcode: str, dist_id: str, fuel_type: str,
+                             customer_type: str) -> int:
+    """Count a distributor's plans. Raises on any HTTP error so failures aren't cached."""
     params = {
         "usageDataSource": "noUsageFrontier",
         "customerType": customer_type,
@@ -149,14 +288,10 @@ def probe_distributor_plans(postcode: str, dist_id: str, fuel_type: str = "E",
         "journey": fuel_type,
         "postcode": postcode,
     }
-    try:
-        resp = requests.get(PLANS_API, params=params, headers=HEADERS, timeout=60)
-        if resp.status_code != 200:
-            return -1
-        plans = resp.json().get("data", {}).get("plans", [])
-        return len(plans)
-    except Exception:
-        return -1
+    with SESSION.get(PLANS_API, params=params, timeout=60) as resp:
+        resp.raise_for_status()
+        plans = _parse_json(resp).get("data", {}).get("plans", [])
+    return len(plans)
 
 
 def fetch_plans(postcode: str, fuel_type: str = "E", customer_type: str = "R",
@@ -173,13 +308,44 @@ def fetch_plans(postcode: str, fuel_type: str = "E", customer_type: str = "R",
         "journey": fuel_type,
         "postcode": postcode,
     }
-    resp = requests.get(PLANS_API, params=params, headers=HEADERS, timeout=60)
-    resp.raise_for_status()
-    data = resp.json()
+    # Plan payloads can run to several MB; close the response as soon as it
+    # is decoded so concurrent fetches don't keep every raw body alive.
+    with SESSION.get(PLANS_API, params=params, timeout=60) as resp:
+        resp.raise_for_status()
+        data = _parse_json(resp)
     plans = data.get("data", {}).get("plans", [])
     return plans
 
 
+def fetch_plans_for_distributors(
+    postcode: str,
+    dist_ids: list[str],
+    fuel_type: str = "E",
+    customer_type: str = "R",
+) -> list[list[dict] | requests.exceptions.RequestException]:
+    """Fetch plans for several distributors concurrently.
+
+    Each fetch is a single I/O-bound request, so running them on a thread
+    pool makes the wall time roughly that of the slowest distributor rather
+    than the sum of all of them.
+
+    Returns one entry per ``dist_ids`` item, in the same order: either the
+    plan list, or the ``RequestException`` raised while fetching it.
+    """
+    def fetch_one(dist_id: str):
+        try:
+            return fetch_plans(postcode, fuel_type, customer_type, dist_id)
+        except requests.exceptions.RequestException as e:
+            return e
+
+    if len(dist_ids) <= 1:
+        return [fetch_one(d) for d in dist_ids]
+
+    workers = min(MAX_CONCURRENT_REQUESTS, len(dist_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fetch_one, dist_ids))
+
+
 # ---------------------------------------------------------------------------
 # Data Extraction Helpers
 # ---------------------------------------------------------------------------
@@ -195,50 +361,66 @@ def extract_supply_charge(contract: dict) -> float | None:
     return None
 
 
-def _collect_usage_rates(contract: dict) -> list[float]:
-    """Collect all usage rates from a contract (inc. GST)."""
+def _collect_usage_rates(contract: dict, pricing_model: str | None = None) -> list[float]:
+    """Collect all usage rates from a contract, as raw API values (ex. GST).
+
+    GST and rounding are applied by the caller to the selected rate only;
+    both are monotonic, so the min/max of the raw rates picks the same rate.
+    ``pricing_model`` may be passed by callers that have already read it.
+    """
     tariff_periods = contract.get("tariffPeriod", [])
     if not tariff_periods:
         return []
     tp = tariff_periods[0]
-    pricing_model = contract.get("pricingModel", "SR")
+    if pricing_model is None:
+        pricing_model = contract.get("pricingModel", "SR")
 
     if pricing_model == "TOU":
-        rates = []
-        for block in tp.get("touBlock", []):
-            for br in block.get("blockRate", []):
-                rates.append(round(br["unitPrice"] * GST_MULTIPLIER, 2))
-        return rates
+        return [br["unitPrice"]
+                for block in tp.get("touBlock", [])
+                for br in block.get("blockRate", [])]
     else:
-        return [round(br["unitPrice"] * GST_MULTIPLIER, 2) for br in tp.get("blockRate", [])]
+        return [br["unitPrice"] for br in tp.get("blockRate", [])]
+
+
+def _usage_rate_summary(contract: dict, pricing_model: str | None = None,
+                        ) -> tuple[float | None, float | None, float | None, float | None]:
+    """Return ``(min, max, peak, offpeak)`` usage rates (inc. GST) from one walk.
+
+    Peak and off-peak are only set for TOU plans, where they are the highest
+    and lowest block rates respectively; for other plans they are ``None``.
+    ``pricing_model`` may be passed by callers that have already read it.
+    """
+    if pricing_model is None:
+        pricing_model = contract.get("pricingModel", "SR")
+    rates = _collect_usage_rates(contract, pricing_model)
+    if not rates:
+        return None, None, None, None
+    low = round(min(rates) * GST_MULTIPLIER, 2)
+    high = round(max(rates) * GST_MULTIPLIER, 2)
+    if pricing_model == "TOU":
+        return low, high, high, low
+    return low, high, None, None
 
 
 def extract_usage_rate_min(contract: dict) -> float | None:
     """Extract the lowest usage rate (inc. GST)."""
-    rates = _collect_usage_rates(contract)
-    return min(rates) if rates else None
+    return _usage_rate_summary(contract)[0]
 
 
 def extract_usage_rate_max(contract: dict) -> float | None:
     """Extract the highest usage rate (inc. GST)."""
-    rates = _collect_usage_rates(contract)
-    return max(rates) if rates else None
+    return _usage_rate_summary(contract)[1]
 
 
 def extract_tou_peak_rate(contract: dict) -> float | None:
     """Extract peak rate for TOU plans (inc. GST)."""
-    if contract.get("pricingModel") != "TOU":
-        return None
-    rates = _collect_usage_rates(contract)
-    return max(rates) if rates else None
+    return _usage_rate_summary(contract)[2]
 
 
 def extract_tou_offpeak_rate(contract: dict) -> float | None:
     """Extract off-peak rate for TOU plans (inc. GST)."""
-    if contract.get("pricingModel") != "TOU":
-        return None
-    rates = _collect_usage_rates(contract)
-    return min(rates) if rates else None
+    return _usage_rate_summary(contract)[3]
 
 
 def _collect_solar_fit_rates(contract: dict) -> list[float]:
@@ -271,16 +453,22 @@ def _collect_solar_fit_rates(contract: dict) -> list[float]:
     return [r for r in rates if r > 0]
 
 
+def _solar_fit_range(contract: dict) -> tuple[float, float]:
+    """Return ``(min, max)`` retailer solar FIT rates (c/kWh, GST exempt) from one walk."""
+    non_zero = _collect_solar_fit_rates(contract)
+    if not non_zero:
+        return 0.0, 0.0
+    return round(min(non_zero), 2), round(max(non_zero), 2)
+
+
 def extract_solar_fit_min(contract: dict) -> float:
     """Extract the lowest solar feed-in tariff rate (c/kWh, GST exempt)."""
-    non_zero = _collect_solar_fit_rates(contract)
-    return round(min(non_zero), 2) if non_zero else 0.0
+    return _solar_fit_range(contract)[0]
 
 
 def extract_solar_fit_max(contract: dict) -> float:
     """Extract the highest solar feed-in tariff rate (c/kWh, GST exempt)."""
-    non_zero = _collect_solar_fit_rates(contract)
-    return round(max(non_zero), 2) if non_zero else 0.0
+    return _solar_fit_range(contract)[1]
 
 
 def extract_solar_fit_details(contract: dict) -> str:
@@ -404,22 +592,8 @@ def extract_meter_types(contract: dict) -> str:
     meters = contract.get("meterType", [])
     if not meters:
         return "N/A"
-    meter_map = {
-        "Type 6": "Basic Meter",
-        "Type 4": "Smart Meter",
-        "Type 4a": "Smart Meter (4a)",
-        "Type 1": "Interval Meter",
-    }
-    readable = []
-    for m in meters:
-        readable.append(meter_map.get(m, m))
-    seen = set()
-    unique = []
-    for r in readable:
-        if r not in seen:
-            seen.add(r)
-            unique.append(r)
-    return ", ".join(unique)
+    # dict.fromkeys de-duplicates while keeping first-seen order
+    return ", ".join(dict.fromkeys(METER_TYPES.get(m, m) for m in meters))
 
 
 def extract_benefit_period(contract: dict) -> str:
@@ -433,13 +607,7 @@ def extract_benefit_period(contract: dict) -> str:
 def extract_contract_term(contract: dict) -> str:
     """Extract contract term type."""
     term = contract.get("termType", "")
-    term_map = {
-        "E": "No lock-in",
-        "1": "1 year",
-        "2": "2 years",
-        "3": "3 years",
-    }
-    return term_map.get(term, term if term else "N/A")
+    return CONTRACT_TERMS.get(term, term if term else "N/A")
 
 
 # ---------------------------------------------------------------------------
@@ -454,11 +622,7 @@ def plan_has_demand_charge(plan: dict) -> bool:
     standard residential customers do not have.
     """
     contract = plan["planData"]["contract"][0]
-    for tp in contract.get("tariffPeriod", []):
-        dc = tp.get("demandCharge")
-        if dc and len(dc) > 0:
-            return True
-    return False
+    return any(tp.get("demandCharge") for tp in contract.get("tariffPeriod", []))
 
 
 def plan_has_controlled_load(plan: dict) -> bool:
@@ -468,8 +632,7 @@ def plan_has_controlled_load(plan: dict) -> bool:
     hot water, pool pumps, or floor heating on a controlled load tariff.
     """
     contract = plan["planData"]["contract"][0]
-    cl = contract.get("controlledLoad")
-    return bool(cl and len(cl) > 0)
+    return bool(contract.get("controlledLoad"))
 
 
 def filter_plans(
@@ -499,6 +662,7 @@ def filter_plans(
         "kept": 0,
     }
 
+    # Demand is checked first, so a plan with both is counted once, under demand
     filtered = []
     for plan in plans:
         if not include_demand and plan_has_demand_charge(plan):
@@ -533,11 +697,17 @@ def process_plan(plan: dict, postcode: str, distributor_name: str = "") -> dict:
     contract = plan_data["contract"][0]  # Primary contract
     pcr = plan.get("pcr", {}).get("costs", {})
 
-    # Get estimated costs for different usage levels
+    # Get estimated yearly costs for the low/medium/high usage benchmarks
     fuel_key = "electricity" if plan_data["fuelType"] == "E" else "gas"
     costs = pcr.get(fuel_key, {})
+    small = costs.get("small", {}).get("yearly", {})
+    medium = costs.get("medium", {}).get("yearly", {})
+    large = costs.get("large", {}).get("yearly", {})
 
     plan_id = plan_data.get("planId", "")
+    pricing_model = contract.get("pricingModel", "")
+    usage_min, usage_max, peak_rate, offpeak_rate = _usage_rate_summary(contract, pricing_model)
+    solar_fit_min, solar_fit_max = _solar_fit_range(contract)
 
     row = {
         "Plan ID": plan_id,
@@ -546,16 +716,16 @@ def process_plan(plan: dict, postcode: str, distributor_name: str = "") -> dict:
         "Distributor": distributor_name if distributor_name else "N/A",
         "Plan URL": build_plan_url(plan_id, postcode),
         "Tariff Type": plan_data.get("tariffType", ""),
-        "Pricing Model": contract.get("pricingModel", ""),
+        "Pricing Model": pricing_model,
         "Contract Term": extract_contract_term(contract),
         "Benefit Period": extract_benefit_period(contract),
         "Supply Charge (c/day)": extract_supply_charge(contract),
-        "Usage Rate Min (c/kWh)": extract_usage_rate_min(contract),
-        "Usage Rate Max (c/kWh)": extract_usage_rate_max(contract),
-        "Peak Rate (c/kWh)": extract_tou_peak_rate(contract),
-        "Off-Peak Rate (c/kWh)": extract_tou_offpeak_rate(contract),
-        "Solar FIT Min (c/kWh)": extract_solar_fit_min(contract),
-        "Solar FIT Max (c/kWh)": extract_solar_fit_max(contract),
+        "Usage Rate Min (c/kWh)": usage_min,
+        "Usage Rate Max (c/kWh)": usage_max,
+        "Peak Rate (c/kWh)": peak_rate,
+        "Off-Peak Rate (c/kWh)": offpeak_rate,
+        "Solar FIT Min (c/kWh)": solar_fit_min,
+        "Solar FIT Max (c/kWh)": solar_fit_max,
         "Solar FIT Details": extract_solar_fit_details(contract),
         "Controlled Load": extract_controlled_load(contract),
         "CL Rate (c/kWh)": extract_controlled_load_rate(contract),
@@ -564,12 +734,12 @@ def process_plan(plan: dict, postcode: str, distributor_name: str = "") -> dict:
         "Fees": extract_fees(contract),
         "Payment Options": extract_payment_options(contract),
         "Meter Types": extract_meter_types(contract),
-        "Est. Cost/Year (Low Usage)": costs.get("small", {}).get("yearly", {}).get("allDiscounts", None),
-        "Est. Cost/Year (Medium Usage)": costs.get("medium", {}).get("yearly", {}).get("allDiscounts", None),
-        "Est. Cost/Year (High Usage)": costs.get("large", {}).get("yearly", {}).get("allDiscounts", None),
-        "Est. Cost/Year (Low, No Disc.)": costs.get("small", {}).get("yearly", {}).get("noDiscounts", None),
-        "Est. Cost/Year (Medium, No Disc.)": costs.get("medium", {}).get("yearly", {}).get("noDiscounts", None),
-        "Est. Cost/Year (High, No Disc.)": costs.get("large", {}).get("yearly", {}).get("noDiscounts", None),
+        "Est. Cost/Year (Low Usage)": small.get("allDiscounts"),
+        "Est. Cost/Year (Medium Usage)": medium.get("allDiscounts"),
+        "Est. Cost/Year (High Usage)": large.get("allDiscounts"),
+        "Est. Cost/Year (Low, No Disc.)": small.get("noDiscounts"),
+        "Est. Cost/Year (Medium, No Disc.)": medium.get("noDiscounts"),
+        "Est. Cost/Year (High, No Disc.)": large.get("noDiscounts"),
     }
 
     return row
@@ -591,7 +761,7 @@ COLUMN_GROUPS = {
 }
 
 # Columns that hold numeric values and should be formatted as numbers in Excel
-NUMERIC_COLUMNS = {
+NUMERIC_COLUMNS = frozenset({
     "Supply Charge (c/day)",
     "Usage Rate Min (c/kWh)",
     "Usage Rate Max (c/kWh)",
@@ -607,10 +777,10 @@ NUMERIC_COLUMNS = {
     "Est. Cost/Year (Low, No Disc.)",
     "Est. Cost/Year (Medium, No Disc.)",
     "Est. Cost/Year (High, No Disc.)",
-}
+})
 
 # Columns that should be rendered as clickable hyperlinks
-LINK_COLUMNS = {"Plan URL"}
+LINK_COLUMNS = frozenset({"Plan URL"})
 
 GROUP_COLORS = {
     "identity": "D6EAF8",
@@ -623,141 +793,253 @@ GROUP_COLORS = {
 }
 
 
+# Reverse lookup of COLUMN_GROUPS: column name -> group
+_COL_TO_GROUP = {col: group for group, cols in COLUMN_GROUPS.items() for col in cols}
+
+
 def get_column_group(col_name: str) -> str | None:
     """Get the group a column belongs to."""
-    for group, cols in COLUMN_GROUPS.items():
-        if col_name in cols:
-            return group
-    return None
+    return _COL_TO_GROUP.get(col_name)
+
+
+# Shared styles, built once and assigned by reference
+_HEADER_FONT = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="2C3E50", end_color="2C3E50", fill_type="solid")
+_HEADER_ALIGN = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_THIN_SIDE = Side(style="thin", color="D5D8DC")
+_THIN_BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+_ALT_FILL = PatternFill(start_color="F2F3F4", end_color="F2F3F4", fill_type="solid")
+_LABEL_FONT = Font(name="Calibri", bold=True, size=11)
+_VALUE_FONT = Font(name="Calibri", size=11)
+_SECTION_FONT = Font(name="Calibri", bold=True, size=13, color="1B4F72")
+
+# Plans sheets: group tint on even rows, light grey for ungrouped columns
+_GROUP_FILLS = {
+    group: PatternFill(start_color=color, end_color=color, fill_type="solid")
+    for group, color in GROUP_COLORS.items()
+}
+_ZEBRA_FILL = PatternFill(start_color="F8F9F9", end_color="F8F9F9", fill_type="solid")
+_CELL_ALIGN = Alignment(vertical="center", wrap_text=True)
+_DATA_FONT = Font(name="Calibri", size=10)
+_LINK_FONT = Font(name="Calibri", size=10, color="0563C1", underline="single")
+
+# Calculator profile legend
+_LEGEND_TITLE_FONT = Font(name="Calibri", bold=True, size=10, color="1B4F72")
+_LEGEND_NAME_FONT = Font(name="Calibri", bold=True, size=9)
+_LEGEND_SPLIT_FONT = Font(name="Calibri", size=9)
+_LEGEND_DESC_FONT = Font(name="Calibri", size=9, italic=True, color="7F8C8D")
+
+
+# Translation table for filenames: keep letters, digits, spaces and hyphens,
+# replace everything else with "_". Characters outside Latin-1 pass through
+# untouched (none of them are reserved in filenames).
+_FILENAME_UNSAFE = str.maketrans({
+    chr(i): "_" for i in range(256) if not (chr(i).isalnum() or chr(i) in " -")
+})
+
+
+def _cell(ws, value=None, font=None, fill=None, border=None, alignment=None,
+          number_format=None) -> WriteOnlyCell:
+    """Build a styled cell for appending to a write-only worksheet."""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if border is not None:
+        cell.border = border
+    if alignment is not None:
+        cell.alignment = alignment
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
+
+
+def _register_style(wb, name: str, font=None, fill=None, border=None, alignment=None,
+                    number_format=None) -> str:
+    """Register a named style on ``wb`` (once) and return its name.
+
+    Assigning ``cell.style = name`` copies one prebuilt style record, whereas
+    setting font/fill/border/alignment/format separately makes openpyxl hash
+    and look up each of them for every cell.
+    """
+    if name not in wb.named_styles:
+        style = NamedStyle(name=name)
+        if font is not None:
+            style.font = font
+        if fill is not None:
+            style.fill = fill
+        if border is not None:
+            style.border = border
+        if alignment is not None:
+            style.alignment = alignment
+        if number_format is not None:
+            style.number_format = number_format
+        wb.add_named_style(style)
+    return name
+
+
+def _header_style(wb) -> str:
+    """Return the named style shared by the table header rows of every sheet."""
+    return _register_style(wb, "Table Header", font=_HEADER_FONT, fill=_HEADER_FILL,
+                           border=_THIN_BORDER, alignment=_HEADER_ALIGN)
+
+
+def _data_styles(wb):
+    """Return ``style_cell(cell, link, number_format, fill)`` for table data cells.
+
+    Every data cell is bordered and wrapped; font and fill come from a named
+    style such as ``"Table Data"`` or ``"Table Link FDEBD0"``, shared by every
+    sheet.  The number format is set on the cell instead, so Excel's Cell
+    Styles gallery gains one entry per font/fill pair rather than one per
+    font/fill/format combination.  The memo is keyed by object identity so a
+    lookup never hashes the fill itself.
+    """
+    names = {}
+
+    def style_cell(cell, link: bool, number_format: str | None = None, fill=None) -> None:
+        key = (link, id(fill))
+        name = names.get(key)
+        if name is None:
+            name = "Table Link" if link else "Table Data"
+            if fill is not None:
+                name += " " + fill.fgColor.rgb[-6:]
+            name = names[key] = _register_style(
+                wb, name, font=_LINK_FONT if link else _DATA_FONT, fill=fill,
+                border=_THIN_BORDER, alignment=_CELL_ALIGN,
+            )
+        cell.style = name
+        if number_format is not None:
+            cell.number_format = number_format
+
+    return style_cell
 
 
 def export_to_excel(plans_data: list[dict], postcode: str, fuel_type: str,
                     customer_type: str, distributor_info: str = "") -> str:
-    """Export plan data to a formatted Excel spreadsheet."""
-    wb = Workbook()
+    """Export plan data to a formatted Excel spreadsheet.
 
-    # ---- Summary sheet ----
-    ws_summary = wb.active
-    ws_summary.title = "Summary"
-
-    # Title
-    ws_summary["A1"] = "Energy Made Easy - Plan Comparison (Enhanced)"
-    ws_summary["A1"].font = Font(name="Calibri", bold=True, size=16, color="1B4F72")
-    ws_summary.merge_cells("A1:D1")
-
-    ws_summary["A3"] = "Postcode:"
-    ws_summary["B3"] = postcode
-    ws_summary["A4"] = "Fuel Type:"
-    ws_summary["B4"] = "Electricity" if fuel_type == "E" else "Gas"
-    ws_summary["A5"] = "Customer Type:"
-    ws_summary["B5"] = "Residential" if customer_type == "R" else "Small Business"
-    ws_summary["A6"] = "Distributor:"
-    ws_summary["B6"] = distributor_info if distributor_info else "All / Auto"
-    ws_summary["A7"] = "Total Plans Found:"
-    ws_summary["B7"] = len(plans_data)
-    ws_summary["A8"] = "Date Scraped:"
-    ws_summary["B8"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    ws_summary["A9"] = "Source:"
-    ws_summary["B9"] = "https://www.energymadeeasy.gov.au/"
-
-    for row in range(3, 10):
-        ws_summary[f"A{row}"].font = Font(name="Calibri", bold=True, size=11)
-        ws_summary[f"B{row}"].font = Font(name="Calibri", size=11)
+    The workbook is write-only: rows are streamed to disk as they are
+    appended, so every sheet is built strictly top to bottom, and column
+    widths / freeze panes must be set before a sheet's first row.
+    """
+    wb = Workbook(write_only=True)
 
+    # ---- Summary sheet ----
+    ws_summary = wb.create_sheet("Summary")
     ws_summary.column_dimensions["A"].width = 20
     ws_summary.column_dimensions["B"].width = 50
 
+    # Title
+    ws_summary.append([_cell(ws_summary, "Energy Made Easy - Plan Comparison (Enhanced)",
+                             font=Font(name="Calibri", bold=True, size=16, color="1B4F72"))])
+    ws_summary.merged_cells.add("A1:D1")
+    ws_summary.append([])
+
+    search_info = [
+        ("Postcode:", postcode),
+        ("Fuel Type:", "Electricity" if fuel_type == "E" else "Gas"),
+        ("Customer Type:", "Residential" if customer_type == "R" else "Small Business"),
+        ("Distributor:", distributor_info if distributor_info else "All / Auto"),
+        ("Total Plans Found:", len(plans_data)),
+        ("Date Scraped:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        ("Source:", "https://www.energymadeeasy.gov.au/"),
+    ]
+    for label, value in search_info:  # rows 3-9
+        ws_summary.append([
+            _cell(ws_summary, label, font=_LABEL_FONT),
+            _cell(ws_summary, value, font=_VALUE_FONT),
+        ])
+    ws_summary.append([])
+
     # Count by retailer
-    ws_summary["A11"] = "Plans by Retailer"
-    ws_summary["A11"].font = Font(name="Calibri", bold=True, size=13, color="1B4F72")
-    ws_summary.merge_cells("A11:B11")
+    ws_summary.append([_cell(ws_summary, "Plans by Retailer",
+                             font=_SECTION_FONT)])
+    ws_summary.merged_cells.add("A11:B11")
 
-    retailer_counts = {}
+    retailer_counts = Counter()
+    dist_counts = Counter()
     for p in plans_data:
-        r = p["Retailer"]
-        retailer_counts[r] = retailer_counts.get(r, 0) + 1
+        retailer_counts[p["Retailer"]] += 1
+        dist_counts[p.get("Distributor", "N/A")] += 1
 
     row_idx = 12
-    ws_summary[f"A{row_idx}"] = "Retailer"
-    ws_summary[f"B{row_idx}"] = "Number of Plans"
-    header_fill = PatternFill(start_color="2C3E50", end_color="2C3E50", fill_type="solid")
-    ws_summary[f"A{row_idx}"].fill = header_fill
-    ws_summary[f"B{row_idx}"].fill = header_fill
-    ws_summary[f"A{row_idx}"].font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
-    ws_summary[f"B{row_idx}"].font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
+    ws_summary.append([
+        _cell(ws_summary, "Retailer", fill=_HEADER_FILL, font=_HEADER_FONT),
+        _cell(ws_summary, "Number of Plans", fill=_HEADER_FILL, font=_HEADER_FONT),
+    ])
 
     for retailer, count in sorted(retailer_counts.items()):
         row_idx += 1
-        ws_summary[f"A{row_idx}"] = retailer
-        ws_summary[f"B{row_idx}"] = count
-        if row_idx % 2 == 0:
-            alt_fill = PatternFill(start_color="F2F3F4", end_color="F2F3F4", fill_type="solid")
-            ws_summary[f"A{row_idx}"].fill = alt_fill
-            ws_summary[f"B{row_idx}"].fill = alt_fill
+        alt_fill = _ALT_FILL if row_idx % 2 == 0 else None
+        ws_summary.append([_cell(ws_summary, retailer, fill=alt_fill),
+                           _cell(ws_summary, count, fill=alt_fill)])
 
     # Count by distributor (if multiple)
-    dist_counts = {}
-    for p in plans_data:
-        d = p.get("Distributor", "N/A")
-        dist_counts[d] = dist_counts.get(d, 0) + 1
-
     if len(dist_counts) > 1:
+        ws_summary.append([])
         row_idx += 2
-        ws_summary[f"A{row_idx}"] = "Plans by Distributor"
-        ws_summary[f"A{row_idx}"].font = Font(name="Calibri", bold=True, size=13, color="1B4F72")
-        ws_summary.merge_cells(f"A{row_idx}:B{row_idx}")
+        ws_summary.append([_cell(ws_summary, "Plans by Distributor",
+                                 font=_SECTION_FONT)])
+        ws_summary.merged_cells.add(f"A{row_idx}:B{row_idx}")
         row_idx += 1
-        ws_summary[f"A{row_idx}"] = "Distributor"
-        ws_summary[f"B{row_idx}"] = "Number of Plans"
-        ws_summary[f"A{row_idx}"].fill = header_fill
-        ws_summary[f"B{row_idx}"].fill = header_fill
-        ws_summary[f"A{row_idx}"].font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
-        ws_summary[f"B{row_idx}"].font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
+        ws_summary.append([
+            _cell(ws_summary, "Distributor", fill=_HEADER_FILL, font=_HEADER_FONT),
+            _cell(ws_summary, "Number of Plans", fill=_HEADER_FILL, font=_HEADER_FONT),
+        ])
         for dist_name, count in sorted(dist_counts.items()):
             row_idx += 1
-            ws_summary[f"A{row_idx}"] = dist_name
-            ws_summary[f"B{row_idx}"] = count
-            if row_idx % 2 == 0:
-                alt_fill = PatternFill(start_color="F2F3F4", end_color="F2F3F4", fill_type="solid")
-                ws_summary[f"A{row_idx}"].fill = alt_fill
-                ws_summary[f"B{row_idx}"].fill = alt_fill
+            alt_fill = _ALT_FILL if row_idx % 2 == 0 else None
+            ws_summary.append([_cell(ws_summary, dist_name, fill=alt_fill),
+                               _cell(ws_summary, count, fill=alt_fill)])
+
+    # ---- Split plans into the per-sheet views in a single pass ----
+    sr_plans, tou_plans, solar_plans, cheap_plans, calc_plans = [], [], [], [], []
+    for p in plans_data:
+        pricing_model = p["Pricing Model"]
+        if pricing_model == "SR":
+            sr_plans.append(p)
+        elif pricing_model == "TOU":
+            tou_plans.append(p)
+        if (p.get("Solar FIT Max (c/kWh)") or 0) > 0:
+            solar_plans.append(p)
+        if p.get("Est. Cost/Year (Medium Usage)") is not None:
+            cheap_plans.append(p)
+        # Only include plans that have enough rate data for meaningful calculations
+        if p.get("Supply Charge (c/day)") is not None and (
+            (p.get("Usage Rate Max (c/kWh)") is not None and pricing_model == "SR")
+            or (p.get("Peak Rate (c/kWh)") is not None and pricing_model == "TOU")
+        ):
+            calc_plans.append(p)
 
     # ---- All Plans sheet ----
     ws_all = wb.create_sheet("All Plans")
     _write_plans_sheet(ws_all, plans_data)
 
     # ---- Single Rate sheet ----
-    sr_plans = [p for p in plans_data if p["Pricing Model"] == "SR"]
     if sr_plans:
         ws_sr = wb.create_sheet("Single Rate Plans")
         _write_plans_sheet(ws_sr, sr_plans)
 
     # ---- Time of Use sheet ----
-    tou_plans = [p for p in plans_data if p["Pricing Model"] == "TOU"]
     if tou_plans:
         ws_tou = wb.create_sheet("Time of Use Plans")
         _write_plans_sheet(ws_tou, tou_plans)
 
     # ---- Solar-Friendly sheet (sorted by highest FIT) ----
-    solar_plans = [p for p in plans_data if (p.get("Solar FIT Max (c/kWh)") or 0) > 0]
     if solar_plans:
         solar_plans.sort(key=lambda p: p.get("Solar FIT Max (c/kWh)") or 0, reverse=True)
         ws_solar = wb.create_sheet("Best Solar FIT")
         _write_plans_sheet(ws_solar, solar_plans)
 
     # ---- Cheapest Plans sheet ----
-    cheap_plans = [p for p in plans_data if p.get("Est. Cost/Year (Medium Usage)") is not None]
     if cheap_plans:
-        cheap_plans.sort(key=lambda p: p["Est. Cost/Year (Medium Usage)"])
+        # Top 50 - a partial selection, no need to sort every plan
+        cheap_plans = heapq.nsmallest(50, cheap_plans, key=lambda p: p["Est. Cost/Year (Medium Usage)"])
         ws_cheap = wb.create_sheet("Cheapest Plans")
-        _write_plans_sheet(ws_cheap, cheap_plans[:50])  # Top 50
+        _write_plans_sheet(ws_cheap, cheap_plans)
 
     # ---- Plan Calculator sheet ----
-    # Only include plans that have enough rate data for meaningful calculations
-    calc_plans = [p for p in plans_data
-                  if (p.get("Supply Charge (c/day)") is not None
-                      and ((p.get("Usage Rate Max (c/kWh)") is not None and p["Pricing Model"] == "SR")
-                           or (p.get("Peak Rate (c/kWh)") is not None and p["Pricing Model"] == "TOU")))]
     calc_info = None
     if calc_plans:
         ws_calc = wb.create_sheet("Plan Calculator")
@@ -767,16 +1049,16 @@ def export_to_excel(plans_data: list[dict], postcode: str, fuel_type: str,
     dist_suffix = ""
     if distributor_info and distributor_info not in ("All / Auto", "Auto"):
         # Sanitise distributor name for filename
-        safe_name = "".join(c if c.isalnum() or c in (" ", "-") else "_" for c in distributor_info)
-        safe_name = safe_name.strip().replace(" ", "_")[:30]
+        safe_name = distributor_info.translate(_FILENAME_UNSAFE).strip().replace(" ", "_")[:30]
         dist_suffix = f"_{safe_name}"
 
     filename = f"energy_plans_{postcode}_{fuel_type}{dist_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     filepath = Path(filename)
     wb.save(filepath)
 
-    # Inject VBA sort macro and convert to .xlsm if Plan Calculator was created
-    if calc_info is not None:
+    # Inject VBA sort macro and convert to .xlsm if Plan Calculator was created.
+    # This drives Excel over COM, so it is only attempted on Windows.
+    if calc_info is not None and sys.platform == "win32":
         header_row, plan_count = calc_info
         try:
             xlsm_path = _inject_vba_and_save_as_xlsm(str(filepath), header_row, plan_count)
@@ -789,85 +1071,80 @@ def export_to_excel(plans_data: list[dict], postcode: str, fuel_type: str,
 
 
 def _write_plans_sheet(ws, plans_data: list[dict]):
-    """Write plan data to a worksheet with formatting."""
+    """Write plan data to a write-only worksheet with formatting."""
     if not plans_data:
         return
 
     columns = list(plans_data[0].keys())
-    thin_border = Border(
-        left=Side(style="thin", color="D5D8DC"),
-        right=Side(style="thin", color="D5D8DC"),
-        top=Side(style="thin", color="D5D8DC"),
-        bottom=Side(style="thin", color="D5D8DC"),
-    )
+    # Per-column attributes, resolved once rather than per cell
+    col_groups = [get_column_group(c) for c in columns]
+    is_link = [c in LINK_COLUMNS for c in columns]
+    num_fmts = [("$#,##0" if "Est. Cost" in c else "0.00") if c in NUMERIC_COLUMNS else None
+                for c in columns]
+    # Even-row fill: the group tint, or light grey for ungrouped columns
+    alt_fills = [_GROUP_FILLS[g] if g else _ZEBRA_FILL for g in col_groups]
+    col_specs = list(zip(columns, is_link, num_fmts, alt_fills))
+    col_letters = tuple(get_column_letter(i) for i in range(1, len(columns) + 1))
+
+    # Auto-fit column widths (with max cap). Sheet layout has to be set
+    # before the first row is streamed, so size from the source data.
+    # Numbers are measured as Excel will display them under their format.
+    def shown(value, num_fmt):
+        if num_fmt and isinstance(value, (int, float)):
+            return f"${value:,.0f}" if num_fmt == "$#,##0" else f"{value:.2f}"
+        return str(value or "")
+
+    sample = plans_data[:50]  # Sample first 50 rows
+    for col_letter, col_name, link, num_fmt in zip(col_letters, columns, is_link, num_fmts):
+        if link:  # Links render as "View Plan", not the URL
+            lens = (len("View Plan") if p.get(col_name) else 0 for p in sample)
+        else:
+            lens = (min(len(shown(p.get(col_name), num_fmt)), 40) for p in sample)
+        max_len = max(len(col_name) + 2, max(lens, default=0))
+        ws.column_dimensions[col_letter].width = min(max_len + 2, 45)
 
-    link_font = Font(name="Calibri", size=10, color="0563C1", underline="single")
+    # Freeze header row
+    ws.freeze_panes = "A2"
 
-    # Write headers
-    header_font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
-    header_fill = PatternFill(start_color="2C3E50", end_color="2C3E50", fill_type="solid")
+    # Add auto-filter
+    ws.auto_filter.ref = f"A1:{col_letters[-1]}{len(plans_data) + 1}"
+
+    # Cells are styled through named styles shared by every plan sheet
+    header_style = _header_style(ws.parent)
+    style_cell = _data_styles(ws.parent)
 
-    for col_idx, col_name in enumerate(columns, 1):
-        cell = ws.cell(row=1, column=col_idx, value=col_name)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        cell.border = thin_border
+    # Write headers
+    header_cells = []
+    for col_name in columns:
+        cell = WriteOnlyCell(ws, value=col_name)
+        cell.style = header_style
+        header_cells.append(cell)
+    ws.append(header_cells)
 
     # Write data rows
-    data_font = Font(name="Calibri", size=10)
     for row_idx, plan in enumerate(plans_data, 2):
-        for col_idx, col_name in enumerate(columns, 1):
+        even_row = not row_idx & 1
+        row_cells = []
+        for col_name, link, num_fmt, alt_fill in col_specs:
             value = plan.get(col_name, "")
-            cell = ws.cell(row=row_idx, column=col_idx)
 
             # Handle hyperlink columns
-            if col_name in LINK_COLUMNS and value:
+            is_url = bool(link and value)
+            if is_url:
+                cell = WriteOnlyCell(ws, value="View Plan")
                 cell.hyperlink = value
-                cell.value = "View Plan"
-                cell.font = link_font
             else:
-                cell.value = value
-                cell.font = data_font
-
-            # Apply number format for numeric columns
-            if col_name in NUMERIC_COLUMNS and isinstance(value, (int, float)):
-                if "Est. Cost" in col_name:
-                    cell.number_format = "$#,##0"
-                else:
-                    cell.number_format = "0.00"
-
-            cell.alignment = Alignment(vertical="center", wrap_text=True)
-            cell.border = thin_border
-
-            # Apply group coloring
-            group = get_column_group(col_name)
-            if group and row_idx % 2 == 0:
-                cell.fill = PatternFill(
-                    start_color=GROUP_COLORS[group],
-                    end_color=GROUP_COLORS[group],
-                    fill_type="solid",
-                )
-            elif row_idx % 2 == 0:
-                cell.fill = PatternFill(
-                    start_color="F8F9F9",
-                    end_color="F8F9F9",
-                    fill_type="solid",
-                )
-
-    # Auto-fit column widths (with max cap)
-    for col_idx, col_name in enumerate(columns, 1):
-        max_len = len(col_name) + 2
-        for row_idx in range(2, min(len(plans_data) + 2, 52)):  # Sample first 50 rows
-            cell_value = str(ws.cell(row=row_idx, column=col_idx).value or "")
-            max_len = max(max_len, min(len(cell_value), 40))
-        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 45)
-
-    # Freeze header row
-    ws.freeze_panes = "A2"
-
-    # Add auto-filter
-    ws.auto_filter.ref = f"A1:{get_column_letter(len(columns))}{len(plans_data) + 1}"
+                cell = WriteOnlyCell(ws, value=value)
+
+            # Number format for numeric columns, group coloring on even rows
+            style_cell(
+                cell,
+                is_url,
+                num_fmt if num_fmt and isinstance(value, (int, float)) else None,
+                alt_fill if even_row else None,
+            )
+            row_cells.append(cell)
+        ws.append(row_cells)
 
 
 # ---------------------------------------------------------------------------
@@ -896,6 +1173,10 @@ USAGE_PROFILES = {
 PROFILE_NAMES = list(USAGE_PROFILES.keys())
 
 
+# One tier of "Solar FIT Details", e.g. "10c/kWh (first 8kWh/day)" or "3c/kWh"
+_FIT_TIER_RE = re.compile(r"\s*([\d.]+)c/kWh(?:\s*\(first\s+([\d.]+)kWh/day\))?")
+
+
 def _parse_solar_fit_tiers(plan: dict) -> list[tuple[float, float]]:
     """Parse solar FIT tiers from a processed plan dict.
 
@@ -909,11 +1190,17 @@ def _parse_solar_fit_tiers(plan: dict) -> list[tuple[float, float]]:
     if not details or details == "No solar feed-in tariff":
         return []
 
+    # Single flat rate (the common case): no split or sort needed
+    if "; " not in details:
+        m = _FIT_TIER_RE.match(details)
+        if not m:
+            return []
+        return [(float(m.group(1)), float(m.group(2)) if m.group(2) else 0.0)]
+
     tiers = []
     # Each tier is separated by "; "
     for part in details.split("; "):
-        # Match patterns like "10c/kWh (first 8kWh/day)" or "3c/kWh"
-        m = re.match(r"([\d.]+)c/kWh(?:\s*\(first\s+([\d.]+)kWh/day\))?", part.strip())
+        m = _FIT_TIER_RE.match(part)
         if m:
             rate = float(m.group(1))
             volume = float(m.group(2)) if m.group(2) else 0.0
@@ -931,10 +1218,11 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
         Rows 1-8:   Input section (user-editable cells highlighted in yellow)
                      Includes daily usage, solar export, TOU profile,
                      controlled load toggle (Yes/No), and CL daily kWh.
-        Row  9:     Blank separator
+        Row  9:     Peak/off-peak split for the selected profile, computed once
+                     and named PeakPct / OffPeakPct for the TOU plan rows
         Rows 10-15: Profile legend
-        Row  16:    Column headers for the plan comparison table
-        Row  17+:   One row per plan with Excel formulas referencing the inputs
+        Row  17:    Column headers for the plan comparison table
+        Row  18+:   One row per plan with Excel formulas referencing the inputs
 
     The user can change the input cells and all costs recalculate automatically.
 
@@ -952,56 +1240,71 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
     if not plans_data:
         return
 
-    thin_border = Border(
-        left=Side(style="thin", color="D5D8DC"),
-        right=Side(style="thin", color="D5D8DC"),
-        top=Side(style="thin", color="D5D8DC"),
-        bottom=Side(style="thin", color="D5D8DC"),
-    )
     label_font = Font(name="Calibri", bold=True, size=11, color="1B4F72")
     input_font = Font(name="Calibri", size=11)
     input_fill = PatternFill(start_color="FFFDE7", end_color="FFFDE7", fill_type="solid")  # pale yellow
     info_font = Font(name="Calibri", size=10, italic=True, color="7F8C8D")
 
+    # Sort plans by supply charge ascending as a neutral default
+    sorted_plans = sorted(plans_data, key=lambda p: (p.get("Supply Charge (c/day)") or 999,
+                                                      p.get("Usage Rate Min (c/kWh)") or 999))
+
+    # The legend occupies rows 11 onwards, followed by a blank row
+    legend_start_row = 11
+    header_row = legend_start_row + len(USAGE_PROFILES) + 1
+    data_start_row = header_row + 1
+    last_row = data_start_row + len(sorted_plans) - 1
+
+    # ---- Sheet layout (must be set before the first row is streamed) ----
+    col_widths = {
+        "A": 40, "B": 20, "C": 12, "D": 12, "E": 15,
+        "F": 18, "G": 18, "H": 20, "I": 22, "J": 24,
+        "K": 30, "L": 18, "M": 18,
+        "N": 10, "O": 12,
+        "P": 20, "Q": 20, "R": 18, "S": 18, "T": 20,
+    }
+    for col_letter, width in col_widths.items():
+        ws.column_dimensions[col_letter].width = width
+
+    # Freeze above the data table header
+    ws.freeze_panes = f"A{data_start_row}"
+
+    # Add auto-filter on the data table
+    if last_row >= data_start_row:
+        ws.auto_filter.ref = f"A{header_row}:T{last_row}"
+
     # ---- Title ----
-    ws["A1"] = "Plan Calculator"
-    ws["A1"].font = Font(name="Calibri", bold=True, size=16, color="1B4F72")
-    ws.merge_cells("A1:F1")
+    ws.append([_cell(ws, "Plan Calculator", font=Font(name="Calibri", bold=True, size=16, color="1B4F72"))])
+    ws.merged_cells.add("A1:F1")
 
-    ws["A2"] = "Enter your estimated usage below. All costs update automatically."
-    ws["A2"].font = info_font
-    ws.merge_cells("A2:F2")
+    ws.append([_cell(ws, "Enter your estimated usage below. All costs update automatically.", font=info_font)])
+    ws.merged_cells.add("A2:F2")
+    ws.append([])
 
     # ---- User Inputs ----
     # Row 4: Daily usage
-    ws["A4"] = "Daily Usage (kWh):"
-    ws["A4"].font = label_font
-    ws["B4"] = 20  # default 20 kWh/day
-    ws["B4"].font = input_font
-    ws["B4"].fill = input_fill
-    ws["B4"].border = thin_border
-    ws["B4"].number_format = "0.0"
-    ws["C4"] = "Your estimated daily electricity consumption"
-    ws["C4"].font = info_font
+    ws.append([
+        _cell(ws, "Daily Usage (kWh):", font=label_font),
+        _cell(ws, 20, font=input_font, fill=input_fill, border=_THIN_BORDER,  # default 20 kWh/day
+              number_format="0.0"),
+        _cell(ws, "Your estimated daily electricity consumption", font=info_font),
+    ])
 
     # Row 5: Solar export
-    ws["A5"] = "Daily Solar Export (kWh):"
-    ws["A5"].font = label_font
-    ws["B5"] = 10  # default 10 kWh/day export
-    ws["B5"].font = input_font
-    ws["B5"].fill = input_fill
-    ws["B5"].border = thin_border
-    ws["B5"].number_format = "0.0"
-    ws["C5"] = "How much solar you expect to export back to the grid per day"
-    ws["C5"].font = info_font
+    ws.append([
+        _cell(ws, "Daily Solar Export (kWh):", font=label_font),
+        _cell(ws, 10, font=input_font, fill=input_fill, border=_THIN_BORDER,  # default 10 kWh/day export
+              number_format="0.0"),
+        _cell(ws, "How much solar you expect to export back to the grid per day", font=info_font),
+    ])
 
     # Row 6: Usage profile (dropdown)
-    ws["A6"] = "Usage Profile (TOU plans):"
-    ws["A6"].font = label_font
-    ws["B6"] = PROFILE_NAMES[0]  # default "Flat Usage"
-    ws["B6"].font = input_font
-    ws["B6"].fill = input_fill
-    ws["B6"].border = thin_border
+    ws.append([
+        _cell(ws, "Usage Profile (TOU plans):", font=label_font),
+        _cell(ws, PROFILE_NAMES[0], font=input_font, fill=input_fill,  # default "Flat Usage"
+              border=_THIN_BORDER),
+        _cell(ws, "Controls peak/off-peak split for Time-of-Use plans", font=info_font),
+    ])
 
     # Add data validation dropdown for usage profile
     profile_list = ",".join(PROFILE_NAMES)
@@ -1014,19 +1317,16 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
     dv.errorTitle = "Invalid Profile"
     dv.prompt = "Select how your usage is distributed across peak/off-peak periods."
     dv.promptTitle = "Usage Profile"
-    ws.add_data_validation(dv)
-    dv.add(ws["B6"])
-
-    ws["C6"] = "Controls peak/off-peak split for Time-of-Use plans"
-    ws["C6"].font = info_font
+    ws.data_validations.append(dv)
+    dv.add("B6")
 
     # Row 7: Controlled Load (Yes/No dropdown)
-    ws["A7"] = "Controlled Load:"
-    ws["A7"].font = label_font
-    ws["B7"] = "No"
-    ws["B7"].font = input_font
-    ws["B7"].fill = input_fill
-    ws["B7"].border = thin_border
+    ws.append([
+        _cell(ws, "Controlled Load:", font=label_font),
+        _cell(ws, "No", font=input_font, fill=input_fill, border=_THIN_BORDER),
+        _cell(ws, "Select Yes if you have a controlled load circuit (hot water, pool pump, etc.)",
+              font=info_font),
+    ])
 
     dv_cl = DataValidation(
         type="list",
@@ -1037,66 +1337,51 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
     dv_cl.errorTitle = "Invalid Choice"
     dv_cl.prompt = "Do you have a controlled load circuit (e.g. off-peak hot water)?"
     dv_cl.promptTitle = "Controlled Load"
-    ws.add_data_validation(dv_cl)
-    dv_cl.add(ws["B7"])
-
-    ws["C7"] = "Select Yes if you have a controlled load circuit (hot water, pool pump, etc.)"
-    ws["C7"].font = info_font
+    ws.data_validations.append(dv_cl)
+    dv_cl.add("B7")
 
     # Row 8: Controlled Load kWh (only relevant when CL = Yes)
-    ws["A8"] = "Controlled Load Usage (kWh/day):"
-    ws["A8"].font = label_font
-    ws["B8"] = 8  # default 8 kWh/day (typical hot water system)
-    ws["B8"].font = input_font
-    ws["B8"].fill = input_fill
-    ws["B8"].border = thin_border
-    ws["B8"].number_format = "0.0"
-    ws["C8"] = "Daily kWh on your controlled load circuit (only used when Controlled Load = Yes)"
-    ws["C8"].font = info_font
-
-    # Row 10-14: Profile legend
-    ws["A10"] = "Profile Reference:"
-    ws["A10"].font = Font(name="Calibri", bold=True, size=10, color="1B4F72")
-    ws.merge_cells("A10:C10")
-
-    legend_row = 11
+    ws.append([
+        _cell(ws, "Controlled Load Usage (kWh/day):", font=label_font),
+        _cell(ws, 8, font=input_font, fill=input_fill, border=_THIN_BORDER,  # default 8 kWh/day (typical hot water system)
+              number_format="0.0"),
+        _cell(ws, "Daily kWh on your controlled load circuit (only used when Controlled Load = Yes)",
+              font=info_font),
+    ])
+
+    # Row 9: Peak/off-peak split for the selected profile. The lookup lives
+    # here once; every TOU plan row references it by name, so Excel
+    # evaluates it once per recalc instead of once per row.
+    names = ",".join(f'"{name}"' for name in PROFILE_NAMES)
+    peaks = ",".join(str(p["peak_pct"]) for p in USAGE_PROFILES.values())
+    offpeaks = ",".join(str(p["offpeak_pct"]) for p in USAGE_PROFILES.values())
+    profile_match = f"MATCH($B$6,{{{names}}},0)"
+    ws.append([
+        _cell(ws, "Peak / Off-Peak Split:", font=info_font),
+        _cell(ws, f"=IFERROR(INDEX({{{peaks}}},{profile_match}),0.5)",
+              font=input_font, number_format="0%"),
+        _cell(ws, f"=IFERROR(INDEX({{{offpeaks}}},{profile_match}),0.5)",
+              font=input_font, number_format="0%"),
+    ])
+    sheet_ref = "'{}'".format(ws.title.replace("'", "''"))
+    ws.parent.defined_names["PeakPct"] = DefinedName("PeakPct", attr_text=f"{sheet_ref}!$B$9")
+    ws.parent.defined_names["OffPeakPct"] = DefinedName("OffPeakPct", attr_text=f"{sheet_ref}!$C$9")
+
+    # Row 10-15: Profile legend
+    ws.append([_cell(ws, "Profile Reference:", font=_LEGEND_TITLE_FONT)])
+    ws.merged_cells.add("A10:C10")
+
     for name, profile in USAGE_PROFILES.items():
-        ws[f"A{legend_row}"] = name
-        ws[f"A{legend_row}"].font = Font(name="Calibri", bold=True, size=9)
         peak_pct = int(profile["peak_pct"] * 100)
         offpeak_pct = int(profile["offpeak_pct"] * 100)
-        ws[f"B{legend_row}"] = f"Peak {peak_pct}% / Off-Peak {offpeak_pct}%"
-        ws[f"B{legend_row}"].font = Font(name="Calibri", size=9)
-        ws[f"C{legend_row}"] = profile["description"]
-        ws[f"C{legend_row}"].font = Font(name="Calibri", size=9, italic=True, color="7F8C8D")
-        legend_row += 1
-
-    # ---- Column widths for input section ----
-    ws.column_dimensions["A"].width = 30
-    ws.column_dimensions["B"].width = 20
-    ws.column_dimensions["C"].width = 55
-
-    # ---- Build the peak/off-peak percentage lookup using nested IFs ----
-    # This formula returns the peak fraction based on the profile selected in B6
-    peak_if_parts = []
-    for name, profile in USAGE_PROFILES.items():
-        peak_if_parts.append(f'IF($B$6="{name}",{profile["peak_pct"]}')
-    # Nest them: IF(B6="Flat Usage",0.5,IF(B6="Slight Peak",0.6,...,0.5))
-    peak_formula_inner = "0.5"  # fallback
-    for part in reversed(peak_if_parts):
-        peak_formula_inner = f"{part},{peak_formula_inner})"
-
-    offpeak_if_parts = []
-    for name, profile in USAGE_PROFILES.items():
-        offpeak_if_parts.append(f'IF($B$6="{name}",{profile["offpeak_pct"]}')
-    offpeak_formula_inner = "0.5"
-    for part in reversed(offpeak_if_parts):
-        offpeak_formula_inner = f"{part},{offpeak_formula_inner})"
+        ws.append([
+            _cell(ws, name, font=_LEGEND_NAME_FONT),
+            _cell(ws, f"Peak {peak_pct}% / Off-Peak {offpeak_pct}%", font=_LEGEND_SPLIT_FONT),
+            _cell(ws, profile["description"], font=_LEGEND_DESC_FONT),
+        ])
+    ws.append([])
 
     # ---- Plan Comparison Table ----
-    header_row = legend_row + 1  # row after legend
-    data_start_row = header_row + 1
-
     # Column layout for the comparison table
     #   A-D:  identity + plan link
     #   E-H:  rates (supply, usage/peak/offpeak)
@@ -1132,40 +1417,39 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
     ]
 
     # Write headers
-    header_font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
-    header_fill = PatternFill(start_color="2C3E50", end_color="2C3E50", fill_type="solid")
-
+    header_cells = []
+    header_style = _header_style(ws.parent)
     for col_name, col_letter in calc_columns:
-        cell = ws[f"{col_letter}{header_row}"]
-        cell.value = col_name
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        cell.border = thin_border
+        cell = WriteOnlyCell(ws, value=col_name)
+        cell.style = header_style
+        header_cells.append(cell)
+    ws.append(header_cells)
 
     # ---- Write plan data rows with formulas ----
-    data_font = Font(name="Calibri", size=10)
-    link_font = Font(name="Calibri", size=10, color="0563C1", underline="single")
     cost_fill_even = PatternFill(start_color="D4EFDF", end_color="D4EFDF", fill_type="solid")  # green tint
     rate_fill_even = PatternFill(start_color="FDEBD0", end_color="FDEBD0", fill_type="solid")  # orange tint
     solar_fill_even = PatternFill(start_color="F9E79F", end_color="F9E79F", fill_type="solid")  # yellow tint
     id_fill_even = PatternFill(start_color="D6EAF8", end_color="D6EAF8", fill_type="solid")    # blue tint
-
-    # Group columns for coloring
-    id_cols = {"A", "B", "C", "D"}
-    rate_cols = {"E", "F", "G", "H"}
-    solar_cols = {"I", "J", "K"}
-    cl_cols = {"L", "M", "R"}
-    pct_cols = {"N", "O"}
-    cost_cols = {"P", "Q", "S", "T"}
     cl_fill_even = PatternFill(start_color="E8DAEF", end_color="E8DAEF", fill_type="solid")  # purple tint
 
-    # Sort plans by supply charge ascending as a neutral default
-    sorted_plans = sorted(plans_data, key=lambda p: (p.get("Supply Charge (c/day)") or 999,
-                                                      p.get("Usage Rate Min (c/kWh)") or 999))
+    # Even-row fill for each column group (the N-O percentage columns stay unfilled)
+    col_fill = {}
+    for letters, fill in (("ABCD", id_fill_even), ("EFGH", rate_fill_even), ("IJK", solar_fill_even),
+                          ("LMR", cl_fill_even), ("PQST", cost_fill_even)):
+        col_fill.update(dict.fromkeys(letters, fill))
+
+    style_cell = _data_styles(ws.parent)
+
+    def set_cell(cells, even_row, col_letter, value, number_format=None, link=False):
+        """Build one fully styled cell, store it in ``cells`` and return it."""
+        fill = col_fill.get(col_letter) if even_row else None
+        cells[col_letter] = cell = WriteOnlyCell(ws, value=value)
+        style_cell(cell, link, number_format, fill)
+        return cell
 
     for row_offset, plan in enumerate(sorted_plans):
         row = data_start_row + row_offset
+        even_row = row % 2 == 0
         is_tou = plan.get("Pricing Model") == "TOU"
         supply = plan.get("Supply Charge (c/day)") or 0
         # For SR plans: use Usage Rate Max (the most common rate / first block)
@@ -1194,100 +1478,68 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
             fit_tier1_vol = 0
             fit_tier2_rate = 0
 
+        # Cells for this row, keyed by column letter
+        cells = {}
+
         # A: Plan Name
-        ws[f"A{row}"] = plan.get("Plan Name", "")
-        ws[f"A{row}"].font = data_font
+        set_cell(cells, even_row, "A", plan.get("Plan Name", ""))
 
         # B: Retailer
-        ws[f"B{row}"] = plan.get("Retailer", "")
-        ws[f"B{row}"].font = data_font
+        set_cell(cells, even_row, "B", plan.get("Retailer", ""))
 
         # C: Tariff Type
-        ws[f"C{row}"] = plan.get("Tariff Type", "")
-        ws[f"C{row}"].font = data_font
+        set_cell(cells, even_row, "C", plan.get("Tariff Type", ""))
 
         # D: Plan URL (clickable hyperlink)
         plan_url = plan.get("Plan URL", "")
         if plan_url:
-            ws[f"D{row}"].hyperlink = plan_url
-            ws[f"D{row}"].value = "View Plan"
-            ws[f"D{row}"].font = link_font
+            set_cell(cells, even_row, "D", "View Plan", link=True).hyperlink = plan_url
         else:
-            ws[f"D{row}"] = ""
-            ws[f"D{row}"].font = data_font
+            set_cell(cells, even_row, "D", "")
 
         # E: Supply (c/day) - static value
-        ws[f"E{row}"] = supply
-        ws[f"E{row}"].font = data_font
-        ws[f"E{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "E", supply, number_format="0.00")
 
         # F: Usage Rate (c/kWh) - for SR plans
-        ws[f"F{row}"] = usage_rate if not is_tou else ""
-        ws[f"F{row}"].font = data_font
-        if not is_tou:
-            ws[f"F{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "F", usage_rate if not is_tou else "",
+                 number_format="0.00" if not is_tou else None)
 
         # G: Peak Rate (c/kWh) - for TOU plans
-        ws[f"G{row}"] = peak_rate if is_tou else ""
-        ws[f"G{row}"].font = data_font
-        if is_tou:
-            ws[f"G{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "G", peak_rate if is_tou else "",
+                 number_format="0.00" if is_tou else None)
 
         # H: Off-Peak Rate (c/kWh) - for TOU plans
-        ws[f"H{row}"] = offpeak_rate if is_tou else ""
-        ws[f"H{row}"].font = data_font
-        if is_tou:
-            ws[f"H{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "H", offpeak_rate if is_tou else "",
+                 number_format="0.00" if is_tou else None)
 
         # I: Solar FIT first tier rate (c/kWh)
-        ws[f"I{row}"] = fit_tier1_rate
-        ws[f"I{row}"].font = data_font
-        ws[f"I{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "I", fit_tier1_rate, number_format="0.00")
 
         # J: Solar FIT remainder tier rate (c/kWh)
-        ws[f"J{row}"] = fit_tier2_rate
-        ws[f"J{row}"].font = data_font
-        ws[f"J{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "J", fit_tier2_rate, number_format="0.00")
 
         # K: Solar FIT Details (text description)
-        ws[f"K{row}"] = plan.get("Solar FIT Details", "")
-        ws[f"K{row}"].font = data_font
+        set_cell(cells, even_row, "K", plan.get("Solar FIT Details", ""))
 
         # L: CL Rate (c/kWh) - controlled load usage rate
-        ws[f"L{row}"] = cl_rate
-        ws[f"L{row}"].font = data_font
-        ws[f"L{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "L", cl_rate, number_format="0.00")
 
         # M: CL Supply (c/day) - controlled load daily supply charge
-        ws[f"M{row}"] = cl_supply
-        ws[f"M{row}"].font = data_font
-        ws[f"M{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "M", cl_supply, number_format="0.00")
 
         # N: Peak % (formula based on profile, only for TOU; 100% for SR)
-        if is_tou:
-            ws[f"N{row}"] = f"={peak_formula_inner}"
-            ws[f"N{row}"].number_format = "0%"
-        else:
-            ws[f"N{row}"] = 1.0  # SR plans: all usage at the single rate
-            ws[f"N{row}"].number_format = "0%"
-        ws[f"N{row}"].font = data_font
+        #    SR plans: all usage at the single rate
+        set_cell(cells, even_row, "N", "=PeakPct" if is_tou else 1.0, number_format="0%")
 
         # O: Off-Peak % (formula based on profile, only for TOU; 0% for SR)
-        if is_tou:
-            ws[f"O{row}"] = f"={offpeak_formula_inner}"
-            ws[f"O{row}"].number_format = "0%"
-        else:
-            ws[f"O{row}"] = 0.0
-            ws[f"O{row}"].number_format = "0%"
-        ws[f"O{row}"].font = data_font
+        set_cell(cells, even_row, "O", "=OffPeakPct" if is_tou else 0.0, number_format="0%")
 
         # P: Usage Cost/day (c)
         if is_tou:
-            ws[f"P{row}"] = f"=$B$4*(N{row}*G{row}+O{row}*H{row})"
+            usage_formula = f"=$B$4*(N{row}*G{row}+O{row}*H{row})"
         else:
-            ws[f"P{row}"] = f"=$B$4*F{row}"
-        ws[f"P{row}"].font = data_font
-        ws[f"P{row}"].number_format = "0.00"
+            usage_formula = f"=$B$4*F{row}"
+        set_cell(cells, even_row, "P", usage_formula, number_format="0.00")
 
         # Q: Solar Credit/day (c) - tiered calculation
         #    If tier1 has a volume cap:
@@ -1296,68 +1548,27 @@ def _write_calculator_sheet(ws, plans_data: list[dict]) -> tuple[int, int]:
         #      credit = export * tier1_rate
         if fit_tier1_vol > 0:
             # Tiered FIT
-            ws[f"Q{row}"] = (
+            solar_formula = (
                 f"=MIN($B$5,{fit_tier1_vol})*I{row}"
                 f"+MAX($B$5-{fit_tier1_vol},0)*J{row}"
             )
         else:
             # Flat FIT (single rate)
-            ws[f"Q{row}"] = f"=$B$5*I{row}"
-        ws[f"Q{row}"].font = data_font
-        ws[f"Q{row}"].number_format = "0.00"
+            solar_formula = f"=$B$5*I{row}"
+        set_cell(cells, even_row, "Q", solar_formula, number_format="0.00")
 
         # R: CL Cost/day (c) - controlled load cost, only applied when B7 = "Yes"
         #    Formula: IF(B7="Yes", CL_usage * CL_rate + CL_supply, 0)
-        ws[f"R{row}"] = f'=IF($B$7="Yes",$B$8*L{row}+M{row},0)'
-        ws[f"R{row}"].font = data_font
-        ws[f"R{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "R", f'=IF($B$7="Yes",$B$8*L{row}+M{row},0)',
+                 number_format="0.00")
 
         # S: Net Cost/day (c) = supply + usage - solar + controlled load
-        ws[f"S{row}"] = f"=E{row}+P{row}-Q{row}+R{row}"
-        ws[f"S{row}"].font = data_font
-        ws[f"S{row}"].number_format = "0.00"
+        set_cell(cells, even_row, "S", f"=E{row}+P{row}-Q{row}+R{row}", number_format="0.00")
 
         # T: Net Cost/month ($) = net_cost_day * 30.44 / 100
-        ws[f"T{row}"] = f"=S{row}*30.44/100"
-        ws[f"T{row}"].font = data_font
-        ws[f"T{row}"].number_format = "$#,##0.00"
-
-        # Apply borders and alternating row coloring
-        for col_name, col_letter in calc_columns:
-            cell = ws[f"{col_letter}{row}"]
-            cell.border = thin_border
-            cell.alignment = Alignment(vertical="center", wrap_text=True)
-
-            if row % 2 == 0:
-                if col_letter in id_cols:
-                    cell.fill = id_fill_even
-                elif col_letter in rate_cols:
-                    cell.fill = rate_fill_even
-                elif col_letter in solar_cols:
-                    cell.fill = solar_fill_even
-                elif col_letter in cl_cols:
-                    cell.fill = cl_fill_even
-                elif col_letter in cost_cols:
-                    cell.fill = cost_fill_even
-
-    # ---- Auto-fit column widths ----
-    col_widths = {
-        "A": 40, "B": 20, "C": 12, "D": 12, "E": 15,
-        "F": 18, "G": 18, "H": 20, "I": 22, "J": 24,
-        "K": 30, "L": 18, "M": 18,
-        "N": 10, "O": 12,
-        "P": 20, "Q": 20, "R": 18, "S": 18, "T": 20,
-    }
-    for col_letter, width in col_widths.items():
-        ws.column_dimensions[col_letter].width = width
-
-    # Freeze above the data table header
-    ws.freeze_panes = f"A{data_start_row}"
+        set_cell(cells, even_row, "T", f"=S{row}*30.44/100", number_format="$#,##0.00")
 
-    # Add auto-filter on the data table
-    last_row = data_start_row + len(sorted_plans) - 1
-    if last_row >= data_start_row:
-        ws.auto_filter.ref = f"A{header_row}:T{last_row}"
+        ws.append([cells[col_letter] for _, col_letter in calc_columns])
 
     return header_row, len(sorted_plans)
 
@@ -1483,9 +1694,15 @@ def select_distributor_interactive(postcode: str, fuel_type: str,
 
     # Multiple distributors - probe each to see which ones have plans
     print(f"  Found {len(distributors)} distributors. Checking plan availability...")
+    workers = min(MAX_CONCURRENT_REQUESTS, len(distributors))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        counts = list(executor.map(
+            lambda d: probe_distributor_plans(postcode, d["id"], fuel_type, customer_type),
+            distributors,
+        ))
+
     available = []
-    for d in distributors:
-        count = probe_distributor_plans(postcode, d["id"], fuel_type, customer_type)
+    for d, count in zip(distributors, counts):
         if count > 0:
             d["plan_count"] = count
             available.append(d)
@@ -1584,6 +1801,11 @@ def main():
         print("Error: Please enter a valid 4-digit Australian postcode.")
         sys.exit(1)
 
+    if not is_covered_postcode(postcode):
+        print(f"Error: Postcode {postcode} is outside Energy Made Easy's coverage.")
+        print("Note: Energy Made Easy covers NSW, QLD, SA, TAS, and ACT only.")
+        sys.exit(1)
+
     fuel_type = "E" if args.fuel == "electricity" else "G"
     customer_type = "R" if args.customer_type == "residential" else "B"
 
@@ -1627,24 +1849,21 @@ def main():
     # Step 2: Determine distributor(s)
     print("\nStep 2: Determining electricity distributor(s)...")
 
-    if args.distributor and args.distributor.lower() == "all":
-        # Fetch all distributors
-        distributors = fetch_distributors(postcode, fuel_type)
-        selected = []
-        for d in distributors:
-            count = probe_distributor_plans(postcode, d["id"], fuel_type, customer_type)
-            if count > 0:
-                d["plan_count"] = count
-                selected.append(d)
-                print(f"  {d['name']} (ID: {d['id']}) - {count} plans")
+    fetch_every_distributor = bool(args.distributor) and args.distributor.lower() == "all"
+    if fetch_every_distributor:
+        # Fetch all distributors. There is no separate probe round: Step 3
+        # fetches every distributor at once and skips those with no plans.
+        selected = fetch_distributors(postcode, fuel_type)
+        for d in selected:
+            print(f"  {d['name']} (ID: {d['id']})")
         if not selected:
-            print("  No distributors returned plans. Trying without distributor filter...")
+            print("  No distributors found. Trying without distributor filter...")
             selected = [{"id": "", "name": "Auto", "plan_count": 0}]
     elif args.distributor:
         # Use the specified distributor ID
         dist_id = args.distributor
-        distributors = fetch_distributors(postcode, fuel_type)
-        dist_name = next((d["name"] for d in distributors if d["id"] == dist_id), f"ID {dist_id}")
+        dist_names = {d["id"]: d["name"] for d in fetch_distributors(postcode, fuel_type)}
+        dist_name = dist_names.get(dist_id, f"ID {dist_id}")
         selected = [{"id": dist_id, "name": dist_name, "plan_count": 0}]
         print(f"  Using specified distributor: {dist_name} (ID: {dist_id})")
     else:
@@ -1662,18 +1881,37 @@ def main():
     start_time = time.time()
 
     for dist in selected:
-        dist_id = dist["id"]
+        print(f"  Fetching plans for {dist['name']}...")
+    results = list(zip(selected, fetch_plans_for_distributors(
+        postcode, [d["id"] for d in selected], fuel_type, customer_type
+    )))
+
+    if fetch_every_distributor:
+        # Keep only the distributors that actually serve this postcode
+        found = []
+        for dist, raw_plans in results:
+            if isinstance(raw_plans, requests.exceptions.RequestException):
+                print(f"    [?] {dist['name']} (ID: {dist['id']}) - error fetching (skipped)")
+            elif not raw_plans:
+                print(f"    [ ] {dist['name']} (ID: {dist['id']}) - no plans (skipped)")
+            else:
+                found.append((dist, raw_plans))
+        if not found:
+            print("  No distributors returned plans. Trying without distributor filter...")
+            auto = {"id": "", "name": "Auto", "plan_count": 0}
+            found = [(auto, fetch_plans_for_distributors(postcode, [""], fuel_type, customer_type)[0])]
+        results = found
+        selected = [dist for dist, _ in found]
+
+    for dist, raw_plans in results:
         dist_name = dist["name"]
         distributor_names.append(dist_name)
 
-        print(f"  Fetching plans for {dist_name}...")
-        try:
-            raw_plans = fetch_plans(postcode, fuel_type, customer_type, dist_id)
-        except requests.exceptions.RequestException as e:
-            print(f"  Error fetching plans for {dist_name}: {e}")
+        if isinstance(raw_plans, requests.exceptions.RequestException):
+            print(f"  Error fetching plans for {dist_name}: {raw_plans}")
             continue
 
-        print(f"    Found {len(raw_plans)} plans from API")
+        print(f"    {dist_name}: found {len(raw_plans)} plans from API")
         for plan in raw_plans:
             plan["_distributor_name"] = dist_name
         all_raw_plans.extend(raw_plans)
@@ -1709,6 +1947,10 @@ def main():
             print(f"    Removed (controlled load):     {filter_stats['controlled_load_filtered']}  (require CL circuit)")
         print(f"    Plans available to you:        {filter_stats['kept']}")
 
+    if not filtered_plans:
+        print(f"\nNo plans left to process for postcode {postcode}.")
+        sys.exit(1)
+
     # Step 4: Process filtered plans
     print(f"\nStep 4: Processing {len(filtered_plans)} plans...")
     all_plans_data = []
@@ -1733,7 +1975,8 @@ def main():
         print(f"\nNo plans found for postcode {postcode}.")
         sys.exit(1)
 
-    print(f"\n  Total: {len(all_plans_data)} plans processed in {elapsed:.1f}s")
+    n_total = len(all_plans_data)
+    print(f"\n  Total: {n_total} plans processed in {elapsed:.1f}s")
 
     # Step 5: Export to Excel
     print("\nStep 5: Exporting to Excel spreadsheet...")
@@ -1762,35 +2005,40 @@ def main():
     print(f"\n{'='*60}")
     print(f"  COMPLETE - Summary")
     print(f"{'='*60}")
-    print(f"  Total plans:        {len(all_plans_data)}")
+    print(f"  Total plans:        {n_total}")
     print(f"  Distributor(s):     {distributor_info}")
 
-    retailers = set(p["Retailer"] for p in all_plans_data)
-    print(f"  Unique retailers:   {len(retailers)}")
+    # Gather every summary figure in a single pass over the plans
+    retailers = set()
+    pricing_model_counts = Counter()
+    cheap, solar_with_fit = [], []
+    for p in all_plans_data:
+        retailers.add(p["Retailer"])
+        pricing_model_counts[p["Pricing Model"]] += 1
+        if p.get("Est. Cost/Year (Medium Usage)") is not None:
+            cheap.append(p)
+        if (p.get("Solar FIT Max (c/kWh)") or 0) > 0:
+            solar_with_fit.append(p)
 
-    sr_count = sum(1 for p in all_plans_data if p["Pricing Model"] == "SR")
-    tou_count = sum(1 for p in all_plans_data if p["Pricing Model"] == "TOU")
-    print(f"  Single rate plans:  {sr_count}")
-    print(f"  Time of use plans:  {tou_count}")
-
-    solar_count = sum(1 for p in all_plans_data if (p.get("Solar FIT Max (c/kWh)") or 0) > 0)
-    print(f"  Plans with solar:   {solar_count}")
+    print(f"  Unique retailers:   {len(retailers)}")
+    print(f"  Single rate plans:  {pricing_model_counts['SR']}")
+    print(f"  Time of use plans:  {pricing_model_counts['TOU']}")
+    print(f"  Plans with solar:   {len(solar_with_fit)}")
 
     # Show cheapest plans
-    cheap = [p for p in all_plans_data if p.get("Est. Cost/Year (Medium Usage)") is not None]
     if cheap:
-        cheap.sort(key=lambda p: p["Est. Cost/Year (Medium Usage)"])
         print(f"\n  Top 5 Cheapest (Medium Usage, with discounts):")
-        for i, p in enumerate(cheap[:5], 1):
+        top_cheap = heapq.nsmallest(5, cheap, key=itemgetter("Est. Cost/Year (Medium Usage)"))
+        for i, p in enumerate(top_cheap, 1):
             dist_label = f" [{p['Distributor']}]" if len(selected) > 1 else ""
             print(f"    {i}. {p['Plan Name']} ({p['Retailer']}{dist_label}) - ${p['Est. Cost/Year (Medium Usage)']:,}/yr")
 
     # Show best solar FIT
-    solar_with_fit = [p for p in all_plans_data if (p.get("Solar FIT Max (c/kWh)") or 0) > 0]
     if solar_with_fit:
-        solar_with_fit.sort(key=lambda p: p.get("Solar FIT Max (c/kWh)") or 0, reverse=True)
         print(f"\n  Top 5 Best Solar Feed-in Tariffs:")
-        for i, p in enumerate(solar_with_fit[:5], 1):
+        # Only plans with a positive FIT made it into solar_with_fit
+        top_solar = heapq.nlargest(5, solar_with_fit, key=itemgetter("Solar FIT Max (c/kWh)"))
+        for i, p in enumerate(top_solar, 1):
             fit_max = p["Solar FIT Max (c/kWh)"]
             fit_min = p.get("Solar FIT Min (c/kWh)", fit_max)
             if fit_min == fit_max: